@@ -6,17 +6,23 @@ Enhanced version that uses Daytona's native streaming capabilities
 import os
 import asyncio
 import re
-import uuid
-from typing import AsyncGenerator, Optional, Dict, Any
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from functools import partial
+from typing import AsyncGenerator, Callable, Optional, Dict, Any
 from datetime import datetime
 from pathlib import Path
 
 from config import Settings
 from models import StreamEvent, StreamEventType
 from sse_adapter import SSEAdapter
+from prompts import AGENT_PROMPT
 from daytona_manager_refactored import DaytonaManagerRefactored
 from rich.console import Console
-from daytona import SessionExecuteRequest
+
+# Claude output line prefixes: file operations, shell commands and code fences
+_CLAUDE_LINE_RE = re.compile(r'(Reading |Editing |\$ |```)(.*)', re.DOTALL)
 
 
 class StreamingAgentOrchestrator:
@@ -33,6 +39,9 @@ class StreamingAgentOrchestrator:
         # Full path to the cloned repository
         self.repo_path = None
         
+        # Blocking Daytona SDK calls run on a small dedicated pool, not the default executor
+        self._io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="daytona-io")
+        
         # Override permission checks for automated operation
         self.manager.permission_manager.saved_permissions = {
             "CREATE_SANDBOX": {"all": True},
@@ -40,100 +49,9 @@ class StreamingAgentOrchestrator:
             "DELETE_SANDBOX": {"all": True}
         }
     
-    async def _execute_streaming_command(
-        self,
-        sandbox: Any,
-        command: str,
-        on_output: Optional[Callable[[str], None]] = None
-    ) -> Dict[str, Any]:
-        """Execute a command with streaming output using Daytona sessions"""
-        session_id = f"stream-{uuid.uuid4().hex[:8]}"
-        
-        try:
-            # Create a session
-            sandbox.process.create_session(session_id)
-            
-            # Execute command asynchronously
-            req = SessionExecuteRequest(
-                command=command,
-                run_async=True  # Important for streaming
-            )
-            
-            # Start command execution
-            response = sandbox.process.execute_session_command(session_id, req)
-            cmd_id = response.cmd_id
-            
-            # Collect output
-            full_output = []
-            
-            async def collect_logs(chunk: str):
-                full_output.append(chunk)
-                if on_output:
-                    on_output(chunk)
-            
-            # Stream logs using async method
-            if hasattr(sandbox.process, 'get_session_command_logs_async'):
-                await sandbox.process.get_session_command_logs_async(
-                    session_id,
-                    cmd_id,
-                    collect_logs
-                )
-            else:
-                # Fallback to polling
-                await self._poll_command_logs(sandbox, session_id, cmd_id, collect_logs)
-            
-            # Get final command status
-            cmd_info = sandbox.process.get_session_command(session_id, cmd_id)
-            
-            return {
-                "success": True,
-                "exit_code": cmd_info.exit_code or 0,
-                "output": "".join(full_output)
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "exit_code": -1,
-                "output": str(e)
-            }
-        finally:
-            # Cleanup session
-            try:
-                sandbox.process.delete_session(session_id)
-            except:
-                pass
-    
-    async def _poll_command_logs(self, sandbox, session_id: str, cmd_id: str, on_output: Callable):
-        """Fallback polling method for streaming logs"""
-        last_position = 0
-        while True:
-            # Get command status
-            cmd_info = await asyncio.to_thread(
-                sandbox.process.get_session_command,
-                session_id,
-                cmd_id
-            )
-            
-            # Get logs
-            logs = await asyncio.to_thread(
-                sandbox.process.get_session_command_logs,
-                session_id,
-                cmd_id
-            )
-            
-            # Send new output
-            if logs and len(logs) > last_position:
-                new_output = logs[last_position:]
-                await on_output(new_output)
-                last_position = len(logs)
-            
-            # Check if command completed
-            if cmd_info.exit_code is not None:
-                break
-            
-            # Small delay
-            await asyncio.sleep(0.1)
+    async def _io(self, func: Callable, *args: Any) -> Any:
+        """Run a blocking SDK call on the I/O pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool, partial(func, *args))
     
     async def _execute_agent_streaming(
         self, 
@@ -144,22 +62,11 @@ class StreamingAgentOrchestrator:
         """Execute Claude agent with real-time streaming"""
         
         # Format prompt for Claude
-        agent_prompt = f"""You are working in the repository {self.repo_path}.
-        
-Task: {prompt}
-
-Instructions:
-1. First explore the repository structure to understand the codebase
-2. Identify the files that need to be modified
-3. Make the necessary changes to implement the requested feature
-4. Ensure your changes follow the existing code style and conventions
-5. Do not modify configuration files unless necessary
-6. Focus only on the specific task requested
-
-Start by exploring the repository structure."""
+        agent_prompt = AGENT_PROMPT.format(repo_path=self.repo_path, prompt=prompt)
         
         # Stream Claude execution
-        command = f'cd {self.repo_path} && claude --print "{agent_prompt}"'
+        # The prompt holds user text, so it is quoted as a single argument
+        command = f"cd {shlex.quote(self.repo_path)} && " + shlex.join(["claude", "--print", agent_prompt])
         
         yield await self.sse_adapter.create_tool_event(
             "AI Message",
@@ -167,102 +74,47 @@ Start by exploring the repository structure."""
             thinking=True
         )
         
-        # Buffer for parsing multi-line outputs
-        output_buffer = []
-        
-        async def handle_output(chunk: str):
-            """Process streaming output from Claude"""
-            nonlocal output_buffer
-            
-            # Add chunk to buffer
-            output_buffer.append(chunk)
-            
-            # Process complete lines
-            full_text = "".join(output_buffer)
-            lines = full_text.split('\n')
-            
-            # Keep incomplete line in buffer
-            if not full_text.endswith('\n'):
-                output_buffer = [lines[-1]]
-                lines = lines[:-1]
-            else:
-                output_buffer = []
-            
-            # Process each complete line
-            for line in lines:
-                if line.strip():
-                    # Detect different types of output
-                    if line.startswith("Reading ") or line.startswith("Editing "):
-                        yield await self.sse_adapter.create_tool_event(
-                            "File Operation",
-                            message=line
-                        )
-                    elif line.startswith("$ "):
-                        yield await self.sse_adapter.create_tool_event(
-                            "Bash",
-                            command=line[2:],
-                            output=""
-                        )
-                    elif line.startswith("```"):
-                        # Code block marker
-                        continue
-                    else:
-                        # Regular output
-                        yield await self.sse_adapter.create_tool_event(
-                            "AI Message",
-                            message=line
-                        )
-        
-        # Create async generator wrapper
-        output_queue = asyncio.Queue()
-        
-        async def output_handler(chunk: str):
-            async for event in handle_output(chunk):
-                await output_queue.put(event)
-        
-        # Start streaming execution
-        exec_task = asyncio.create_task(
-            self._execute_streaming_command(
-                sandbox,
-                command,
-                lambda chunk: asyncio.create_task(output_handler(chunk))
-            )
-        )
-        
-        # Yield events as they come
-        while True:
-            try:
-                # Wait for either a new event or execution completion
-                get_event = asyncio.create_task(output_queue.get())
-                done, pending = await asyncio.wait(
-                    [get_event, exec_task],
-                    return_when=asyncio.FIRST_COMPLETED
-                )
-                
-                if get_event in done:
-                    event = await get_event
-                    yield event
-                
-                if exec_task in done:
-                    # Execution completed, drain remaining events
-                    while not output_queue.empty():
-                        yield await output_queue.get()
-                    break
-                    
-            except Exception as e:
-                yield await self.sse_adapter.create_tool_event(
-                    "Error",
-                    message=f"Streaming error: {str(e)}"
-                )
-                break
-        
-        # Get execution result
-        result = await exec_task
-        if not result["success"]:
+        # Lines are consumed in order straight from the session; closing the
+        # iterator deletes the session, which stops Claude if the client leaves
+        try:
+            async with aclosing(self.manager.stream_command(sandbox, command, executor=self._io_pool)) as lines:
+                async for line in lines:
+                    event = await self._claude_line_event(line)
+                    if event:
+                        yield event
+        except Exception as e:
             yield await self.sse_adapter.create_tool_event(
                 "Error",
-                message=f"Agent execution failed: {result['output']}"
+                message=f"Agent execution failed: {str(e)}"
+            )
+    
+    async def _claude_line_event(self, line: str) -> Optional[StreamEvent]:
+        """Turn one line of Claude output into an event (None for blanks and code fences)"""
+        if not line.strip():
+            return None
+        
+        # Detect different types of output with a single prefix match
+        match = _CLAUDE_LINE_RE.match(line)
+        kind = match.group(1) if match else None
+        if kind in ("Reading ", "Editing "):
+            return await self.sse_adapter.create_tool_event(
+                "File Operation",
+                message=line
             )
+        if kind == "$ ":
+            return await self.sse_adapter.create_tool_event(
+                "Bash",
+                command=match.group(2),
+                output=""
+            )
+        if kind == "```":
+            # Code block marker
+            return None
+        # Regular output
+        return await self.sse_adapter.create_tool_event(
+            "AI Message",
+            message=line
+        )
     
     async def debug_sandbox(self, sandbox: Any) -> None:
         """Debug sandbox state using streaming commands"""
@@ -277,13 +129,12 @@ Start by exploring the repository structure."""
         
         for cmd, description in debug_commands:
             print(f"\n=== {description} ===")
-            result = await self._execute_streaming_command(
-                sandbox,
-                cmd,
-                lambda chunk: print(chunk, end="")
-            )
-            if result["exit_code"] != 0:
-                print(f"\nError: Exit code {result['exit_code']}")
+            try:
+                async with aclosing(self.manager.stream_command(sandbox, cmd, executor=self._io_pool)) as lines:
+                    async for line in lines:
+                        print(line)
+            except Exception as e:
+                print(f"\nError: {e}")
     
     # Include all other methods from original AgentOrchestrator
     # (process_request, _parse_github_url, _clone_repository, etc.)
@@ -322,9 +173,6 @@ Start by exploring the repository structure."""
         finally:
             if sandbox_id:
                 try:
-                    await asyncio.to_thread(
-                        self.manager.delete_sandbox,
-                        sandbox_id
-                    )
+                    await self._io(self.manager.delete_sandbox, sandbox_id)
                 except:
                     pass
\ No newline at end of file
@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0", env="API_HOST")
     port: int = Field(default=8000, env="API_PORT")
     debug: bool = Field(default=False, env="DEBUG")
+    # Each worker process has its own orchestrator, sandbox pool and caches
+    workers: int = Field(default=1, env="UVICORN_WORKERS")
     
     # CORS Settings
     cors_origins: List[str] = Field(
@@ -33,6 +35,14 @@ class Settings(BaseSettings):
         default="https://app.daytona.io/api",
         env="DAYTONA_API_URL"
     )
+    # Threads for blocking SDK calls; 50 keeps sandbox setup from queueing
+    # behind the default executor's min(32, cpu + 4) workers under load
+    sandbox_exec_workers: int = Field(default=50, env="SANDBOX_EXEC_WORKERS")
+    max_parallel_sandbox_ops: int = Field(default=32, env="MAX_PARALLEL_SANDBOX_OPS")
+    sandbox_pool_size: int = Field(default=2, env="SANDBOX_POOL_SIZE")  # 0 disables reuse
+    sandbox_pool_min_idle: int = Field(default=0, env="SANDBOX_POOL_MIN_IDLE")
+    sandbox_max_age: int = Field(default=1800, env="SANDBOX_MAX_AGE")  # seconds
+    max_concurrent_sandboxes: int = Field(default=4, env="MAX_CONCURRENT_SANDBOXES")  # 0 = no cap
     
     # Agent Configuration
     agent_type: str = Field(default="claude", env="AGENT_TYPE")
@@ -50,6 +60,12 @@ class Settings(BaseSettings):
     max_file_size: int = Field(default=1048576, env="MAX_FILE_SIZE")  # 1MB
     max_files_per_pr: int = Field(default=50, env="MAX_FILES_PER_PR")
     
+    # Repository Mirrors (empty directory disables host-side mirrors)
+    repo_mirror_dir: str = Field(default="", env="REPO_MIRROR_DIR")
+    repo_mirror_max_age: int = Field(default=300, env="REPO_MIRROR_MAX_AGE")  # seconds
+    # Larger repositories are cloned shallow from GitHub instead of from the full-history bundle
+    repo_mirror_max_bundle_bytes: int = Field(default=52428800, env="REPO_MIRROR_MAX_BUNDLE_BYTES")  # 50MB
+    
     # Rate Limiting
     rate_limit_requests: int = Field(default=10, env="RATE_LIMIT_REQUESTS")
     rate_limit_window: int = Field(default=3600, env="RATE_LIMIT_WINDOW")  # seconds
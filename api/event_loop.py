@@ -0,0 +1,62 @@
+"""
+Event Loop Selection - Picks the asyncio loop the API servers run on
+Uses uringcore's io_uring loop on Linux when it is installed, uvloop otherwise
+"""
+
+import os
+import sys
+import asyncio
+
+# Optional io_uring loop - fall back to uvloop if not installed
+try:
+    import uringcore
+except ImportError:
+    uringcore = None
+
+# uvloop ships with uvicorn[standard], except on Windows
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# httptools also comes with uvicorn[standard]; plain uvicorn only has h11
+try:
+    import httptools
+except ImportError:
+    httptools = None
+
+# Server settings for long-lived SSE connections
+SERVER_OPTIONS = {
+    "http": "httptools" if httptools is not None else "auto",
+    "backlog": 2048,
+    "timeout_keep_alive": 75
+}
+
+# Network operations on io_uring need a 5.6+ kernel
+_MIN_KERNEL = (5, 6)
+
+
+def _kernel_version() -> tuple:
+    try:
+        release = os.uname().release.split("-")[0]
+        return tuple(int(part) for part in release.split(".")[:2])
+    except (AttributeError, ValueError):
+        return (0, 0)
+
+
+def configure_event_loop(in_process: bool = True) -> str:
+    """Install the uringcore loop policy if possible and return uvicorn's loop setting
+
+    Set USE_URINGCORE=0 to use uvloop instead. The policy only applies to
+    this process, so pass in_process=False when uvicorn serves from spawned
+    processes (reload or several workers).
+    """
+    fallback = "uvloop" if uvloop is not None else "auto"
+    if not in_process or os.getenv("USE_URINGCORE", "1").lower() in ("0", "false", "no"):
+        return fallback
+    if uringcore is None or sys.platform != "linux" or _kernel_version() < _MIN_KERNEL:
+        return fallback
+
+    asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+    # "none" stops uvicorn from replacing the policy installed above
+    return "none"
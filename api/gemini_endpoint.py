@@ -7,6 +7,7 @@ Implements POST /code endpoint with Server-Sent Events streaming
 import os
 import sys
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from datetime import datetime
 from contextlib import asynccontextmanager
@@ -21,6 +22,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from gemini_daytona_manager import GeminiDaytonaManager
 from gemini_streaming import GeminiStreamingHandler
+from sse_adapter import coalesce_frames
+from sandbox_pool import SandboxPool
 
 
 # Request model
@@ -29,24 +32,51 @@ class CodeRequest(BaseModel):
     prompt: str
 
 
-# Sandbox cleanup manager
+# Sandboxes handed out to in-flight requests
 active_sandboxes = []
+# Warm sandboxes kept between requests, also capping how many are in use; set up in lifespan
+sandbox_pool: Optional[SandboxPool] = None
+# Sandbox resets still running after their request finished
+cleanup_tasks: set = set()
+
+# Shared, bounded pool for the blocking Daytona SDK calls of all requests
+sandbox_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SANDBOX_EXEC_WORKERS", "8")),
+    thread_name_prefix="gemini-sbx"
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Manage application lifecycle - cleanup sandboxes on shutdown"""
-    yield
-    # Cleanup sandboxes on shutdown
+    """Manage application lifecycle - warm the sandbox pool, cleanup sandboxes on shutdown"""
+    global sandbox_pool
     console = Console()
+    manager = GeminiDaytonaManager(console)
+    sandbox_pool = SandboxPool(
+        manager,
+        "gemini",
+        max_idle=int(os.getenv("SANDBOX_POOL_SIZE", "2")),  # 0 disables reuse
+        min_idle=int(os.getenv("SANDBOX_POOL_MIN_IDLE", "0")),
+        max_age=int(os.getenv("SANDBOX_MAX_AGE", "1800")),
+        resources={"cpu": 2, "memory": 4},
+        executor=sandbox_executor,
+        max_active=int(os.getenv("MAX_CONCURRENT_SANDBOXES", "4"))  # 0 = no cap
+    )
+    sandbox_pool.prewarm()
+    yield
+    # Let finished requests return their sandboxes, then delete the idle ones
+    if cleanup_tasks:
+        await asyncio.gather(*cleanup_tasks, return_exceptions=True)
+    await sandbox_pool.close()
+    # Cleanup sandboxes of requests still running
     if active_sandboxes:
         console.print("[yellow]🧹 Cleaning up sandboxes...[/yellow]")
-        manager = GeminiDaytonaManager(console)
         for sandbox_id in active_sandboxes:
             try:
                 manager.delete_sandbox(sandbox_id)
             except:
                 pass
+    sandbox_executor.shutdown(wait=False)
 
 
 # Create FastAPI app
@@ -94,9 +124,9 @@ async def create_code_pr(request: CodeRequest):
     console.print(f"  Repository: {request.repoUrl}")
     console.print(f"  Prompt: {request.prompt[:100]}...")
     
-    # Initialize managers
-    manager = GeminiDaytonaManager(console)
-    stream_handler = GeminiStreamingHandler(console)
+    # The pool's manager is shared, so each request doesn't reconnect to Daytona
+    manager = sandbox_pool.manager
+    stream_handler = GeminiStreamingHandler(console, executor=sandbox_executor)
     
     # Create sandbox
     sandbox_name = f"gemini-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
@@ -104,20 +134,16 @@ async def create_code_pr(request: CodeRequest):
     async def process_request():
         """Process the coding request with streaming"""
         sandbox = None
-        sandbox_id = None
         
         try:
-            # Create sandbox
+            # Get a warm sandbox, or create one
             yield stream_handler._format_sse({
                 "type": "status",
-                "message": "Creating Daytona sandbox...",
+                "message": "Acquiring Daytona sandbox...",
                 "timestamp": datetime.now().isoformat()
             })
             
-            sandbox = await asyncio.to_thread(
-                manager.create_gemini_sandbox,
-                sandbox_name
-            )
+            sandbox = await sandbox_pool.acquire(sandbox_name)
             
             if not sandbox:
                 yield stream_handler._format_sse({
@@ -127,12 +153,11 @@ async def create_code_pr(request: CodeRequest):
                 })
                 return
             
-            sandbox_id = sandbox.id
-            active_sandboxes.append(sandbox_id)
+            active_sandboxes.append(sandbox.id)
             
             yield stream_handler._format_sse({
                 "type": "status",
-                "message": f"Sandbox created: {sandbox_id}",
+                "message": f"Sandbox ready: {sandbox.id}",
                 "timestamp": datetime.now().isoformat()
             })
             
@@ -144,6 +169,10 @@ async def create_code_pr(request: CodeRequest):
                     sandbox, repo, branch, title, body
                 )
             }
+            if manager.supports_streaming(sandbox):
+                sandbox_operations['stream_gemini'] = lambda prompt, repo: manager.stream_gemini_prompt(
+                    sandbox, prompt, repo, executor=sandbox_executor
+                )
             
             # Stream the coding process
             async for event in stream_handler.stream_coding_process(
@@ -162,23 +191,30 @@ async def create_code_pr(request: CodeRequest):
             })
         
         finally:
-            # Cleanup sandbox after a delay
-            if sandbox_id:
-                async def cleanup():
-                    await asyncio.sleep(300)  # Wait 5 minutes before cleanup
-                    try:
-                        if sandbox_id in active_sandboxes:
-                            active_sandboxes.remove(sandbox_id)
-                            manager.delete_sandbox(sandbox_id)
-                            console.print(f"[dim]🧹 Cleaned up sandbox: {sandbox_id}[/dim]")
-                    except:
-                        pass
+            # Reset the sandbox and return it to the pool once the stream has ended
+            if sandbox:
+                async def recycle():
+                    reusable = False
+                    if sandbox_pool.enabled:
+                        try:
+                            # Off the event loop, like every other SDK call
+                            reusable = await asyncio.get_running_loop().run_in_executor(
+                                sandbox_executor, manager.reset_sandbox, sandbox
+                            )
+                        except Exception:
+                            pass
+                    if sandbox.id in active_sandboxes:
+                        active_sandboxes.remove(sandbox.id)
+                    await sandbox_pool.release(sandbox, reusable=reusable)
                 
-                asyncio.create_task(cleanup())
+                task = asyncio.create_task(recycle())
+                # The loop only keeps weak references to tasks
+                cleanup_tasks.add(task)
+                task.add_done_callback(cleanup_tasks.discard)
     
     # Return streaming response
     return StreamingResponse(
-        process_request(),
+        coalesce_frames(process_request()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -191,6 +227,7 @@ async def create_code_pr(request: CodeRequest):
 # Run the application
 if __name__ == "__main__":
     import uvicorn
+    from event_loop import SERVER_OPTIONS, configure_event_loop
     
     port = int(os.getenv("API_PORT", "8000"))
     host = os.getenv("API_HOST", "0.0.0.0")
@@ -202,5 +239,7 @@ if __name__ == "__main__":
         app,
         host=host,
         port=port,
-        log_level="info"
+        loop=configure_event_loop(),
+        log_level="info",
+        **SERVER_OPTIONS
     )
\ No newline at end of file
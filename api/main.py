@@ -10,6 +10,7 @@ import asyncio
 import time
 from datetime import datetime
 from typing import Optional
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,7 +18,7 @@ from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 
 from models import CodeRequest, CodeResponse, StreamEvent
-from sse_adapter import SSEAdapter
+from sse_adapter import SSEAdapter, coalesce_frames
 from agent_orchestrator import AgentOrchestrator
 from config import Settings
 
@@ -35,11 +36,20 @@ load_dotenv()
 # Initialize settings
 settings = Settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage application lifecycle - warm the sandbox pool, delete pooled sandboxes on shutdown"""
+    agent_orchestrator.sandbox_pool.prewarm()
+    yield
+    await agent_orchestrator.shutdown()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Tiny Backspace API",
     description="Autonomous coding agent that creates PRs from prompts",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -150,8 +160,14 @@ async def create_code_pr(
             async for event in agent_orchestrator.process_request(
                 request_id=request_id,
                 repo_url=request.repo_url,
-                prompt=request.prompt
+                prompt=request.prompt,
+                require_fresh=request.require_fresh
             ):
+                # Agent progress lines come pre-formatted
+                if isinstance(event, str):
+                    yield event
+                    continue
+                
                 # Track PR creation
                 if event.type == "pr_created":
                     pr_created = True
@@ -191,7 +207,7 @@ async def create_code_pr(
     
     # Return SSE response
     return StreamingResponse(
-        generate_events(),
+        coalesce_frames(generate_events()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -203,11 +219,16 @@ async def create_code_pr(
 
 if __name__ == "__main__":
     import uvicorn
+    from event_loop import SERVER_OPTIONS, configure_event_loop
     
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        log_level="info"
+        workers=settings.workers,
+        # The reloader and workers serve from child processes, which wouldn't get the policy
+        loop=configure_event_loop(in_process=not settings.debug and settings.workers == 1),
+        log_level="info",
+        **SERVER_OPTIONS
     )
\ No newline at end of file
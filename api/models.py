@@ -19,6 +19,10 @@ class CodeRequest(BaseModel):
         description="Natural language description of code changes",
         example="Add input validation to all POST endpoints"
     )
+    require_fresh: bool = Field(
+        default=False,
+        description="Fetch the latest repository state instead of using a cached mirror"
+    )
     
     @validator('repo_url')
     def validate_github_url(cls, v):
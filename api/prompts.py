@@ -0,0 +1,18 @@
+"""
+Agent Prompts - Instructions shared by the orchestrators
+"""
+
+# Agent instructions; filled in per request with str.format
+AGENT_PROMPT = """You are working in the repository {repo_path}.
+
+Task: {prompt}
+
+Instructions:
+1. First explore the repository structure to understand the codebase
+2. Identify the files that need to be modified
+3. Make the necessary changes to implement the requested feature
+4. Ensure your changes follow the existing code style and conventions
+5. Do not modify configuration files unless necessary
+6. Focus only on the specific task requested
+
+Start by exploring the repository structure."""
@@ -0,0 +1,120 @@
+"""
+Repository Mirror Cache - Host-side bare clones of GitHub repositories
+Sandboxes are seeded from a local git bundle instead of cloning over the network
+"""
+
+import os
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class RepoMirrorCache:
+    """Keeps one bare mirror per repository and refreshes it periodically
+
+    Mirrors live under root as {owner}__{repo}.git. A mirror older than
+    max_age seconds is refreshed with `git fetch --prune` before use.
+    Bundles larger than max_bundle_bytes are not handed out, since a
+    shallow clone from GitHub transfers less than their full history.
+    Credentials are passed to git through its environment, never on the
+    command line or in the mirror's config.
+    """
+
+    def __init__(self, root: str, max_age: int = 300, max_bundle_bytes: int = 50 * 1024 * 1024):
+        self.root = root
+        self.max_age = max_age
+        self.max_bundle_bytes = max_bundle_bytes
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Mirrors are disabled when no root directory is configured"""
+        return bool(self.root)
+
+    def _mirror_path(self, owner: str, repo: str) -> str:
+        return os.path.join(self.root, f"{owner}__{repo}.git")
+
+    async def ensure_fresh(
+        self,
+        owner: str,
+        repo: str,
+        clone_url: str,
+        force: bool = False,
+        auth_header: Optional[str] = None
+    ) -> str:
+        """Create or refresh the mirror for a repository and return its path
+
+        force refreshes the mirror regardless of its age, for requests that
+        need the current HEAD on GitHub. auth_header (e.g. "Authorization:
+        Basic ...") is sent with every request to GitHub.
+        """
+        key = f"{owner}/{repo}"
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        path = self._mirror_path(owner, repo)
+
+        async with lock:
+            if not os.path.isdir(path):
+                os.makedirs(self.root, exist_ok=True)
+                await self._git("clone", "--bare", "--quiet", clone_url, path, auth_header=auth_header)
+                await self._write_bundle(path)
+            elif force or time.time() - os.path.getmtime(path) > self.max_age:
+                await self._git(
+                    "-C", path, "fetch", "--prune", "--quiet", clone_url, "+refs/heads/*:refs/heads/*",
+                    auth_header=auth_header
+                )
+                await self._write_bundle(path)
+
+        return path
+
+    async def get_bundle(
+        self,
+        owner: str,
+        repo: str,
+        clone_url: str,
+        force: bool = False,
+        auth_header: Optional[str] = None
+    ) -> Optional[str]:
+        """Return the path of a git bundle of the mirror's default branch
+
+        Returns None when the bundle is larger than max_bundle_bytes. The
+        file is replaced atomically on refresh, so it can be streamed as is.
+        """
+        path = await self.ensure_fresh(owner, repo, clone_url, force=force, auth_header=auth_header)
+        bundle_path = f"{path}.bundle"
+        if os.path.getsize(bundle_path) > self.max_bundle_bytes:
+            return None
+        return bundle_path
+
+    async def _write_bundle(self, path: str) -> None:
+        """Bundle HEAD and the default branch so a clone checks out that branch
+
+        The bundle carries the branch's full history. Bundles can't describe
+        a shallow cut, so one built from a depth-1 history lists the parent
+        commit as a prerequisite and `git clone` rejects it.
+        """
+        default_ref = (await self._git("-C", path, "symbolic-ref", "HEAD")).strip()
+        await self._git("-C", path, "bundle", "create", f"{path}.bundle.tmp", "HEAD", default_ref)
+        os.replace(f"{path}.bundle.tmp", f"{path}.bundle")
+        # Mirror mtime marks the last refresh
+        os.utime(path)
+
+    async def _git(self, *args: str, auth_header: Optional[str] = None) -> str:
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        if auth_header:
+            # Same as `git -c http.https://github.com/.extraHeader=...` (git 2.31+),
+            # but the header stays out of the process list
+            env.update({
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.https://github.com/.extraHeader",
+                "GIT_CONFIG_VALUE_0": auth_header
+            })
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"git command failed: {stderr.decode(errors='replace').strip()}")
+        return stdout.decode(errors="replace")
@@ -0,0 +1,196 @@
+"""
+Sandbox Pool - Keeps warm sandboxes around for reuse across requests
+Avoids paying sandbox creation and tool installation on every request
+"""
+
+import asyncio
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional, Set
+
+
+class SandboxPool:
+    """Pool of idle sandboxes for a single agent type
+
+    Sandboxes are handed out with acquire() and returned with release().
+    Returned sandboxes are kept idle for the next request until they exceed
+    max_age, at which point they are deleted and replaced. The most recently
+    returned sandbox is handed out first, so the least recently used ones
+    are the ones left to expire. With max_active set, acquire() waits while
+    that many sandboxes are handed out and not yet released.
+    """
+
+    def __init__(
+        self,
+        manager: Any,
+        sandbox_type: str,
+        max_idle: int = 2,
+        min_idle: int = 0,
+        max_age: int = 1800,
+        resources: Optional[Dict[str, Any]] = None,
+        executor: Optional[Executor] = None,
+        debug: bool = False,
+        max_active: int = 0
+    ):
+        self.manager = manager
+        self.sandbox_type = sandbox_type
+        self.max_idle = max(max_idle, 0)
+        self.min_idle = min(max(min_idle, 0), self.max_idle)
+        self.max_age = max_age
+        self.resources = resources or {"cpu": 1, "memory": 2}
+        # None runs blocking SDK calls on the loop's default executor
+        self.executor = executor
+        self.debug = debug
+        # Caps sandboxes in use at once (0 = no cap), so bursts can't exhaust the quota
+        self._slots: Optional[asyncio.Semaphore] = asyncio.Semaphore(max_active) if max_active > 0 else None
+
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue(maxsize=max(self.max_idle, 1))
+        # Creation time (monotonic) of every live sandbox owned by the pool
+        self._created_at: Dict[str, float] = {}
+        # Sandboxes that already have the agent tooling installed
+        self._provisioned: Set[str] = set()
+        self._fill_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        """Whether released sandboxes are kept for reuse"""
+        return self.max_idle > 0
+
+    async def acquire(self, name: str) -> Optional[Any]:
+        """Get an idle sandbox, creating a new one if none is available"""
+        if self._slots:
+            await self._slots.acquire()
+        try:
+            sandbox = await self._acquire(name)
+        except BaseException:
+            self._release_slot()
+            raise
+        if not sandbox:
+            self._release_slot()
+        return sandbox
+
+    async def _acquire(self, name: str) -> Optional[Any]:
+        while not self._idle.empty():
+            sandbox = self._idle.get_nowait()
+            if self._expired(sandbox):
+                await self._discard(sandbox)
+                continue
+
+            if self.debug:
+                print(f"DEBUG: Reusing pooled sandbox {sandbox.id}", flush=True)
+            self._schedule_fill()
+            return sandbox
+
+        sandbox = await self._create(name)
+        self._schedule_fill()
+        return sandbox
+
+    async def release(self, sandbox: Any, reusable: bool = True) -> None:
+        """Return a sandbox to the pool, deleting it if it can't be reused"""
+        if not sandbox:
+            return
+
+        try:
+            await self._return(sandbox, reusable)
+        finally:
+            self._release_slot()
+
+    async def _return(self, sandbox: Any, reusable: bool) -> None:
+        if not reusable or self._closed or not self.enabled or self._expired(sandbox):
+            await self._discard(sandbox)
+            return
+
+        # Least recently used sandboxes sit under the fresh ones and would never be reached
+        await self._evict_expired()
+        try:
+            self._idle.put_nowait(sandbox)
+            if self.debug:
+                print(f"DEBUG: Returned sandbox {sandbox.id} to pool ({self._idle.qsize()} idle)", flush=True)
+        except asyncio.QueueFull:
+            await self._discard(sandbox)
+
+    def prewarm(self) -> None:
+        """Start creating sandboxes in the background until min_idle are idle"""
+        self._schedule_fill()
+
+    def is_provisioned(self, sandbox: Any) -> bool:
+        """Check whether the agent tooling was already installed in a sandbox"""
+        return sandbox.id in self._provisioned
+
+    def mark_provisioned(self, sandbox: Any) -> None:
+        """Record that the agent tooling is installed in a sandbox"""
+        self._provisioned.add(sandbox.id)
+
+    async def close(self) -> None:
+        """Stop topping up the pool and delete all idle sandboxes"""
+        self._closed = True
+        if self._fill_task and not self._fill_task.done():
+            self._fill_task.cancel()
+
+        while not self._idle.empty():
+            await self._discard(self._idle.get_nowait())
+
+    async def _evict_expired(self) -> None:
+        """Delete idle sandboxes past max_age, keeping the others in order"""
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+
+        for sandbox in reversed(idle):
+            if self._expired(sandbox):
+                await self._discard(sandbox)
+            else:
+                self._idle.put_nowait(sandbox)
+
+    def _release_slot(self) -> None:
+        if self._slots:
+            self._slots.release()
+
+    def _expired(self, sandbox: Any) -> bool:
+        created_at = self._created_at.get(sandbox.id)
+        return created_at is None or time.monotonic() - created_at > self.max_age
+
+    async def _create(self, name: str) -> Optional[Any]:
+        def create():
+            return self.manager.create_sandbox(
+                name=name,
+                sandbox_type=self.sandbox_type,
+                resources=self.resources
+            )
+
+        sandbox = await asyncio.get_running_loop().run_in_executor(self.executor, create)
+        if sandbox:
+            self._created_at[sandbox.id] = time.monotonic()
+        return sandbox
+
+    async def _discard(self, sandbox: Any) -> None:
+        self._created_at.pop(sandbox.id, None)
+        self._provisioned.discard(sandbox.id)
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.manager.delete_sandbox, sandbox.id
+            )
+        except Exception:
+            pass  # Best effort cleanup
+
+    def _schedule_fill(self) -> None:
+        """Start a background top-up to min_idle unless one is already running"""
+        if self._closed or self.min_idle <= 0:
+            return
+        if self._fill_task and not self._fill_task.done():
+            return
+        self._fill_task = asyncio.create_task(self._fill())
+
+    async def _fill(self) -> None:
+        while not self._closed and self._idle.qsize() < self.min_idle:
+            sandbox = await self._create(f"tb-pool-{uuid.uuid4().hex[:8]}")
+            if not sandbox:
+                break
+
+            try:
+                self._idle.put_nowait(sandbox)
+            except asyncio.QueueFull:
+                await self._discard(sandbox)
+                break
@@ -0,0 +1,75 @@
+"""
+Persistent Sandbox Shell - Runs commands through one long-lived shell session
+Avoids starting a fresh process in the sandbox for every command
+"""
+
+import threading
+import uuid
+from typing import Any, Optional
+
+# Session support is only available in newer SDK releases
+try:
+    from daytona import SessionExecuteRequest
+except ImportError:
+    SessionExecuteRequest = None
+
+
+class PersistentShell:
+    """Long-lived shell session inside a sandbox
+
+    Commands are executed in a subshell of the session so that `cd`, `exit`
+    and variable assignments don't leak into later commands. Only one command
+    runs at a time; run() returns None when the session is busy or unusable so
+    the caller can fall back to a one-off exec.
+    """
+
+    def __init__(self, sandbox: Any):
+        self.sandbox = sandbox
+        self.session_id = f"tb-shell-{uuid.uuid4().hex[:8]}"
+        self.available = SessionExecuteRequest is not None
+        self._started = False
+        self._lock = threading.Lock()
+
+    def run(self, command: str) -> Optional[str]:
+        """Run a command in the session and return its output
+
+        Blocking; call from a worker thread.
+        """
+        if not self.available or not self._lock.acquire(blocking=False):
+            return None
+
+        try:
+            if not self._started:
+                self.sandbox.process.create_session(self.session_id)
+                self._started = True
+
+            response = self.sandbox.process.execute_session_command(
+                self.session_id,
+                # stdin is detached so nothing in the command can read the session's input
+                SessionExecuteRequest(command=f"(\n{command}\n) < /dev/null 2>&1", run_async=False)
+            )
+
+            output = getattr(response, "output", None)
+            if output is None:
+                output = self.sandbox.process.get_session_command_logs(self.session_id, response.cmd_id)
+            return output or ""
+
+        except Exception as e:
+            # Sessions unsupported or broken for this sandbox; stop trying
+            print(f"WARNING: Persistent shell unavailable, using per-command exec: {e}", flush=True)
+            self.available = False
+            return None
+
+        finally:
+            self._lock.release()
+
+    def close(self) -> None:
+        """Delete the session (best effort)"""
+        if not self._started:
+            return
+
+        try:
+            self.sandbox.process.delete_session(self.session_id)
+        except Exception:
+            pass
+        self._started = False
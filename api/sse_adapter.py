@@ -5,12 +5,25 @@ Converts internal streaming events to SSE format
 
 import json
 import asyncio
-from typing import AsyncGenerator, Optional, Dict, Any
+from typing import AsyncGenerator, AsyncIterable, Optional, Dict, Any
 from datetime import datetime
 
 from models import StreamEvent, StreamEventType, ToolEvent, AIMessageEvent, ProgressEvent
 from streaming_types import ResponseType, StreamChunk
 
+# orjson encodes SSE payloads several times faster; fall back to json if not installed
+try:
+    import orjson
+    
+    def _dumps(data: Any) -> str:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _dumps = json.dumps
+
+# Flush a batch of SSE frames once it reaches this size or the stream goes quiet this long
+COALESCE_MAX_BYTES = 8192
+COALESCE_MAX_DELAY = 0.005
+
 
 class SSEAdapter:
     """Adapter to convert streaming responses to SSE format"""
@@ -27,7 +40,20 @@ class SSEAdapter:
             "timestamp": event.timestamp.isoformat() if event.timestamp else datetime.utcnow().isoformat()
         }
         
-        return f"data: {json.dumps(event_data)}\n\n"
+        return f"data: {_dumps(event_data)}\n\n"
+    
+    def format_tool_message(self, tool_name: str, message: str) -> str:
+        """Format a tool event carrying only a message directly as SSE data
+        
+        Same frame as format_event(create_tool_event(tool_name, message=message)),
+        without building the event model for every log line.
+        """
+        event_data = {
+            "type": f"Tool: {tool_name}",
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        return f"data: {_dumps(event_data)}\n\n"
     
     def format_raw_event(self, event_type: str, data: Dict[str, Any]) -> str:
         """Format raw event data as SSE"""
@@ -149,4 +175,64 @@ class SSEAdapter:
         return StreamEvent(
             type=event_type,
             data=data
-        )
\ No newline at end of file
+        )
+
+
+async def coalesce_frames(
+    frames: AsyncIterable[str],
+    max_bytes: int = COALESCE_MAX_BYTES,
+    max_delay: float = COALESCE_MAX_DELAY
+) -> AsyncGenerator[str, None]:
+    """Join SSE frames that arrive in quick succession into one response chunk
+    
+    Each chunk is one ASGI send, so bursts of small frames go out together.
+    A batch is flushed when no frame follows within max_delay, so an event is
+    never held back longer than that.
+    """
+    frames = aiter(frames)
+    # The next frame is awaited in a task, so a flush timeout doesn't cancel the source
+    pending: Optional[asyncio.Future] = None
+    batch = []
+    size = 0
+    
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(frames))
+            
+            if batch:
+                done, _ = await asyncio.wait({pending}, timeout=max_delay)
+                if not done:
+                    yield "".join(batch)
+                    batch.clear()
+                    size = 0
+                    continue
+            
+            try:
+                frame = await pending
+            except StopAsyncIteration:
+                break
+            except Exception:
+                # Deliver what the source produced before it failed
+                if batch:
+                    yield "".join(batch)
+                raise
+            finally:
+                pending = None
+            
+            batch.append(frame)
+            size += len(frame)
+            if size >= max_bytes:
+                yield "".join(batch)
+                batch.clear()
+                size = 0
+        
+        if batch:
+            yield "".join(batch)
+    finally:
+        # Client went away: stop the frame in flight before closing the source
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        if hasattr(frames, "aclose"):
+            await frames.aclose()
@@ -0,0 +1,191 @@
+"""
+Test setup - Makes the api modules importable the way main.py imports them
+Also provides an orchestrator whose sandboxes are local shells and whose GitHub API is faked
+"""
+
+import asyncio
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import types
+
+import pytest
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The Daytona managers live at the repository root
+ROOT_DIR = os.path.dirname(API_DIR)
+for path in (ROOT_DIR, API_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def git(*args, cwd=None):
+    """Run git on the host for test setup and assertions"""
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+class LocalSandboxManager:
+    """Stands in for DaytonaManagerRefactored; each sandbox is a directory and commands run in bash
+
+    Every command is recorded as (sandbox id, command, env). https://github.com/
+    URLs resolve to bare repositories under remotes_dir.
+    """
+
+    def __init__(self, root, remotes_dir):
+        self.root = root
+        self.remotes_dir = remotes_dir
+        self.permission_manager = types.SimpleNamespace(saved_permissions={})
+        self.commands = []
+        self.deleted = []
+        self._ids = itertools.count(1)
+
+    def create_sandbox(self, name, sandbox_type="claude", resources=None):
+        sandbox_id = f"local-{next(self._ids)}"
+        home = os.path.join(self.root, sandbox_id)
+        os.makedirs(home)
+        env = {
+            "HOME": home,
+            "GIT_CONFIG_NOSYSTEM": "1",
+            "GIT_TERMINAL_PROMPT": "0",
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": f"url.file://{self.remotes_dir}/.insteadOf",
+            "GIT_CONFIG_VALUE_0": "https://github.com/"
+        }
+        # No session API, so the orchestrator uses per-command exec
+        return types.SimpleNamespace(id=sandbox_id, home=home, env=env, process=types.SimpleNamespace())
+
+    def delete_sandbox(self, sandbox_id):
+        self.deleted.append(sandbox_id)
+        return True
+
+    def supports_streaming(self, sandbox):
+        return False
+
+    @staticmethod
+    def script_command(script):
+        from daytona_manager_refactored import DaytonaManagerRefactored
+        return DaytonaManagerRefactored.script_command(script)
+
+    def execute_command(self, sandbox, command, show_output=True, env=None):
+        self.commands.append((sandbox.id, command, env or {}))
+        result = subprocess.run(
+            ["bash", "-c", command],
+            cwd=sandbox.home,
+            env={**os.environ, **sandbox.env, **(env or {})},
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            timeout=60
+        )
+        return result.stdout
+
+    def upload_file(self, sandbox, content, remote_path):
+        if isinstance(content, str):
+            shutil.copyfile(content, remote_path)
+        else:
+            with open(remote_path, "wb") as f:
+                f.write(content)
+        return True
+
+
+class FakeGitHub:
+    """GitHub REST API for the orchestrator's httpx client
+
+    default_branches maps "owner/repo" to its default branch. Pull request
+    creation answers with pull_response, a (status, JSON body) pair.
+    """
+
+    def __init__(self):
+        self.default_branches = {}
+        self.pull_response = None
+        self.requests = []
+
+    def handle(self, request):
+        import httpx
+        self.requests.append(request)
+        parts = request.url.path.strip("/").split("/")
+        if request.method == "GET" and len(parts) == 3 and parts[0] == "repos":
+            branch = self.default_branches.get(f"{parts[1]}/{parts[2]}")
+            if branch is None:
+                return httpx.Response(404, json={"message": "Not Found"})
+            return httpx.Response(200, json={"default_branch": branch})
+        if request.method == "POST" and parts[-1] == "pulls":
+            status, body = self.pull_response or (
+                201, {"html_url": f"https://github.com/{parts[1]}/{parts[2]}/pull/1"}
+            )
+            return httpx.Response(status, json=body)
+        return httpx.Response(404, json={"message": "Not Found"})
+
+
+def create_remote(remotes_dir, owner, repo, branch="main", files=None):
+    """Create a bare repository standing in for github.com/owner/repo, with one commit on branch"""
+    work = os.path.join(remotes_dir, f".work-{owner}-{repo}")
+    git("init", "-q", "-b", branch, work)
+    for name, content in (files or {"README.md": "# repo\n"}).items():
+        with open(os.path.join(work, name), "w") as f:
+            f.write(content)
+    git("add", "-A", cwd=work)
+    git("commit", "-q", "-m", "Initial commit", cwd=work)
+    bare = os.path.join(remotes_dir, owner, f"{repo}.git")
+    git("clone", "-q", "--bare", work, bare)
+    return bare
+
+
+@pytest.fixture
+def github():
+    return FakeGitHub()
+
+
+@pytest.fixture
+def remotes_dir(tmp_path):
+    path = tmp_path / "remotes"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def orchestrator(monkeypatch, tmp_path, github, remotes_dir):
+    """AgentOrchestrator built through __init__ on a LocalSandboxManager"""
+    pytest.importorskip("httpx")
+    pytest.importorskip("daytona")
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    import httpx
+    import agent_orchestrator
+    from config import Settings
+
+    for name, value in {
+        "GITHUB_TOKEN": "ghp_test_token",
+        "GITHUB_USERNAME": "tester",
+        "GITHUB_EMAIL": "tester@example.com",
+        "REPO_MIRROR_DIR": "",
+        "DEBUG": "false"
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv("TB_DEBUG", raising=False)
+
+    sandboxes_dir = tmp_path / "sandboxes"
+    sandboxes_dir.mkdir()
+    manager = LocalSandboxManager(str(sandboxes_dir), remotes_dir)
+    monkeypatch.setattr(agent_orchestrator, "DaytonaManagerRefactored", lambda console=None: manager)
+    monkeypatch.setattr(agent_orchestrator, "_SANDBOX_LOG_FILE", str(tmp_path / "sandbox.log"))
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(github.handle), **kwargs)
+    )
+
+    orchestrator = agent_orchestrator.AgentOrchestrator(Settings())
+    yield orchestrator
+    asyncio.run(orchestrator.shutdown())
+
+
+@pytest.fixture
+def sandbox(orchestrator):
+    return orchestrator.manager.create_sandbox("test")
@@ -0,0 +1,209 @@
+"""
+Agent Orchestrator Tests - Pipeline stages run against local sandboxes and a fake GitHub API
+"""
+
+import asyncio
+import base64
+import json
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("daytona")
+
+from conftest import create_remote, git
+
+REPO_URL = "https://github.com/owner/repo.git"
+
+
+async def _checkout(orchestrator, sandbox, branch="tb/change"):
+    """Clone owner/repo into the sandbox and switch to a work branch"""
+    orchestrator.base_dir = sandbox.home
+    await orchestrator._setup_git_config(sandbox)
+    result = await orchestrator._clone_repository(sandbox, "owner", "repo", REPO_URL)
+    assert result["success"], result
+    await orchestrator._create_branch(sandbox, "repo", branch)
+    return orchestrator.repo_path
+
+
+def test_clone_authenticates_with_a_header(orchestrator, sandbox, remotes_dir):
+    create_remote(remotes_dir, "owner", "repo")
+
+    repo_path = asyncio.run(_checkout(orchestrator, sandbox))
+
+    assert os.path.isfile(os.path.join(repo_path, "README.md"))
+    clone = next(entry for entry in orchestrator.manager.commands if " clone " in entry[1])
+    assert "ghp_test_token" not in clone[1]
+    assert base64.b64decode(clone[2]["TB_GIT_AUTH"]).decode() == "tester:ghp_test_token"
+    # Neither the remote URL nor the config keeps the credentials
+    assert git("remote", "get-url", "origin", cwd=repo_path).strip() == REPO_URL
+    assert "extraHeader" not in git("config", "--list", "--local", cwd=repo_path)
+
+
+def test_commit_message_reaches_git_unchanged(orchestrator, sandbox, remotes_dir):
+    create_remote(remotes_dir, "owner", "repo")
+    prompt = 'add "quoted" $(touch pwned) `touch pwned2` feature'
+
+    async def run():
+        repo_path = await _checkout(orchestrator, sandbox)
+        with open(os.path.join(repo_path, "app.py"), "w") as f:
+            f.write("print('hi')\n")
+        return repo_path, await orchestrator._commit_changes(sandbox, "repo", prompt)
+
+    repo_path, result = asyncio.run(run())
+
+    assert "error" not in result
+    assert result["files_changed"] == 1
+    assert result["commit_type"] == "feat"
+    assert result["status"].strip() == "A  app.py"
+    assert f"Task: {prompt}" in git("log", "-1", "--format=%B", cwd=repo_path)
+    assert not any(name.startswith("pwned") for name in os.listdir(sandbox.home) + os.listdir(repo_path))
+
+
+def test_commit_failure_is_reported(orchestrator, sandbox, remotes_dir):
+    create_remote(remotes_dir, "owner", "repo")
+
+    async def run():
+        repo_path = await _checkout(orchestrator, sandbox)
+        hooks = os.path.join(repo_path, ".git", "hooks")
+        os.makedirs(hooks, exist_ok=True)
+        with open(os.path.join(hooks, "pre-commit"), "w") as f:
+            f.write("#!/bin/sh\necho 'lint failed' >&2\nexit 1\n")
+        os.chmod(os.path.join(hooks, "pre-commit"), 0o755)
+        with open(os.path.join(repo_path, "app.py"), "w") as f:
+            f.write("print('hi')\n")
+        return await orchestrator._commit_changes(sandbox, "repo", "add a feature")
+
+    result = asyncio.run(run())
+
+    assert result["files_changed"] == 0
+    assert "exited with 1" in result["error"]
+    assert "lint failed" in result["error"]
+
+
+def test_rejected_push_raises(orchestrator, sandbox, remotes_dir):
+    bare = create_remote(remotes_dir, "owner", "repo")
+    # Someone else already pushed a different commit to the work branch
+    other = os.path.join(remotes_dir, "other")
+    git("clone", "-q", bare, other)
+    git("checkout", "-q", "-b", "tb/change", cwd=other)
+    git("commit", "-q", "--allow-empty", "-m", "Elsewhere", cwd=other)
+    git("push", "-q", "origin", "tb/change", cwd=other)
+
+    async def run():
+        repo_path = await _checkout(orchestrator, sandbox)
+        with open(os.path.join(repo_path, "app.py"), "w") as f:
+            f.write("print('hi')\n")
+        await orchestrator._commit_changes(sandbox, "repo", "add a feature")
+        await orchestrator._push_branch(sandbox, "tb/change")
+
+    with pytest.raises(ValueError, match="rejected"):
+        asyncio.run(run())
+
+
+def test_pull_request_targets_the_default_branch(orchestrator, sandbox, remotes_dir, github):
+    create_remote(remotes_dir, "owner", "repo", branch="develop", files={"app.py": "print('v1')\n"})
+    github.default_branches["owner/repo"] = "develop"
+
+    async def run():
+        repo_path = await _checkout(orchestrator, sandbox)
+        with open(os.path.join(repo_path, "app.py"), "w") as f:
+            f.write("print('v2')\n")
+        commit_result = await orchestrator._commit_changes(sandbox, "repo", "update the greeting")
+        return await orchestrator._create_pull_request(
+            sandbox, "owner", "repo", "tb/change", "update the greeting", commit_result
+        )
+
+    result = asyncio.run(run())
+
+    assert result["success"], result
+    assert result["pr_url"] == "https://github.com/owner/repo/pull/1"
+    post = next(request for request in github.requests if request.method == "POST")
+    assert post.url.path == "/repos/owner/repo/pulls"
+    assert post.headers["Authorization"] == "Bearer ghp_test_token"
+    payload = json.loads(post.content)
+    assert payload["base"] == "develop"
+    assert payload["head"] == "tb/change"
+    assert payload["title"] == "feat: update the greeting"
+    # The highlights were diffed against develop
+    assert "print('v2')" in payload["body"]
+    # The branch reached the remote before the PR was requested
+    assert git("rev-parse", "--verify", "-q", "refs/heads/tb/change", cwd=os.path.join(remotes_dir, "owner", "repo.git"))
+
+
+def test_pull_request_error_response_is_a_failure(orchestrator, sandbox, remotes_dir, github):
+    create_remote(remotes_dir, "owner", "repo")
+    github.default_branches["owner/repo"] = "main"
+    github.pull_response = (422, {
+        "message": "Validation Failed",
+        "errors": [{"message": "A pull request already exists for owner:tb/change."}]
+    })
+
+    async def run():
+        repo_path = await _checkout(orchestrator, sandbox)
+        with open(os.path.join(repo_path, "app.py"), "w") as f:
+            f.write("print('hi')\n")
+        commit_result = await orchestrator._commit_changes(sandbox, "repo", "add a feature")
+        return await orchestrator._create_pull_request(
+            sandbox, "owner", "repo", "tb/change", "add a feature", commit_result
+        )
+
+    result = asyncio.run(run())
+
+    assert result["success"] is False
+    assert "A pull request already exists" in result["error"]
+
+
+def test_pipeline_exception_reaches_the_caller(orchestrator, monkeypatch):
+    async def failing_pipeline(request_id, repo_url, prompt, require_fresh):
+        yield "data: started\n\n"
+        raise RuntimeError("pipeline broke")
+
+    monkeypatch.setattr(orchestrator, "_process_request", failing_pipeline)
+
+    async def consume():
+        events = []
+        with pytest.raises(RuntimeError, match="pipeline broke"):
+            async for event in orchestrator.process_request("req", REPO_URL, "prompt"):
+                events.append(event)
+        return events
+
+    assert asyncio.run(consume()) == ["data: started\n\n"]
+
+
+def test_log_buffers_are_kept_per_sandbox(orchestrator):
+    first = orchestrator.manager.create_sandbox("first")
+    second = orchestrator.manager.create_sandbox("second")
+
+    async def run():
+        await orchestrator._initialize_sandbox_logging(first)
+        await orchestrator._log_to_sandbox(first, "cloning")
+        # A second request starting must not drop the first one's entries
+        await orchestrator._initialize_sandbox_logging(second)
+        await orchestrator._log_to_sandbox(second, "agent started")
+        await orchestrator._flush_logs(first)
+        await orchestrator._flush_logs(second)
+
+    asyncio.run(run())
+
+    def flushed(sandbox_id):
+        # The flush command is `echo <base64> | base64 -d >> <log file>`
+        command = [c for s, c, _ in orchestrator.manager.commands if s == sandbox_id][-1]
+        return base64.b64decode(command.split()[1]).decode()
+
+    assert "cloning" in flushed(first.id) and "agent started" not in flushed(first.id)
+    assert "agent started" in flushed(second.id) and "cloning" not in flushed(second.id)
+
+
+def test_parse_numstat_resolves_renames(orchestrator):
+    stats = orchestrator._parse_numstat(
+        "1\t0\tsrc/{old => new}/app.py\n"
+        "2\t1\t{a => }/b.py\n"
+        "0\t0\tlib/{util => }/helpers.py\n"
+        "3\t0\tREADME.md => docs/README.md\n"
+        "-\t-\tlogo.png\n"
+    )
+
+    assert list(stats["files"]) == ["src/new/app.py", "b.py", "lib/helpers.py", "docs/README.md", "logo.png"]
+    assert stats["stats"] == {"total": 5, "additions": 6, "deletions": 1}
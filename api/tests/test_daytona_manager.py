@@ -0,0 +1,96 @@
+"""
+Daytona Manager Tests - Session command streaming against a fake sandbox
+"""
+
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("daytona")
+
+import daytona_manager_refactored
+from daytona_manager_refactored import DaytonaManagerRefactored
+
+
+class FakeProcess:
+    """Session API of a sandbox whose command prints log and exits with exit_code"""
+    
+    def __init__(self, log: str, exit_code: int = 0):
+        self.log = log
+        self.exit_code = exit_code
+        self.sessions = set()
+        self.polls = 0
+    
+    def create_session(self, session_id):
+        self.sessions.add(session_id)
+    
+    def delete_session(self, session_id):
+        self.sessions.discard(session_id)
+    
+    def execute_session_command(self, session_id, request):
+        return types.SimpleNamespace(cmd_id="cmd-1")
+    
+    def get_session_command_logs(self, session_id, cmd_id):
+        # Output arrives over two polls
+        self.polls += 1
+        return self.log if self.polls > 1 else self.log[:len(self.log) // 2]
+    
+    def get_session_command(self, session_id, cmd_id):
+        return types.SimpleNamespace(exit_code=self.exit_code if self.polls > 1 else None)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setenv("DAYTONA_API_KEY", "test-key")
+    monkeypatch.setattr(daytona_manager_refactored, "Daytona", lambda config: object())
+    monkeypatch.setattr(daytona_manager_refactored, "SessionExecuteRequest", types.SimpleNamespace)
+    return DaytonaManagerRefactored()
+
+
+async def _lines(manager, sandbox, command="claude --print task"):
+    return [line async for line in manager.stream_command(sandbox, command)]
+
+
+def test_stream_command_yields_lines(manager):
+    process = FakeProcess("first line\nsecond line\nlast")
+    sandbox = types.SimpleNamespace(process=process)
+    
+    assert asyncio.run(_lines(manager, sandbox)) == ["first line", "second line", "last"]
+    assert not process.sessions
+
+
+def test_stream_command_raises_on_nonzero_exit(manager):
+    process = FakeProcess("working\nerror: no credentials\n", exit_code=2)
+    sandbox = types.SimpleNamespace(process=process)
+    received = []
+    
+    async def consume():
+        async for line in manager.stream_command(sandbox, "claude --print task"):
+            received.append(line)
+    
+    with pytest.raises(RuntimeError, match="exited with code 2"):
+        asyncio.run(consume())
+    assert received == ["working", "error: no credentials"]
+    assert not process.sessions
+
+
+def test_stream_command_raises_when_log_stream_fails(manager):
+    process = FakeProcess("", exit_code=0)
+    
+    async def get_session_command_logs_async(session_id, cmd_id, on_stdout, on_stderr):
+        on_stdout("partial output\n")
+        raise ConnectionError("log stream dropped")
+    
+    process.get_session_command_logs_async = get_session_command_logs_async
+    sandbox = types.SimpleNamespace(process=process)
+    received = []
+    
+    async def consume():
+        async for line in manager.stream_command(sandbox, "claude --print task"):
+            received.append(line)
+    
+    with pytest.raises(ConnectionError, match="log stream dropped"):
+        asyncio.run(consume())
+    assert received == ["partial output"]
+    assert not process.sessions
@@ -0,0 +1,102 @@
+"""
+Repository Mirror Tests - Bundles built from a local source repository
+"""
+
+import asyncio
+import shutil
+import subprocess
+
+import pytest
+
+from repo_mirror import RepoMirrorCache
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def _git(*args, cwd=None):
+    return subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _commit(repo, name, content):
+    (repo / name).write_text(content)
+    _git("add", name, cwd=repo)
+    _git("commit", "-q", "-m", f"Add {name}", cwd=repo)
+
+
+def test_bundle_clones_default_branch(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    _git("init", "-q", "-b", "main", str(source))
+    _commit(source, "README.md", "hello\n")
+    _commit(source, "app.py", "print('hi')\n")
+    # A second branch must not end up checked out
+    _git("checkout", "-q", "-b", "feature", cwd=source)
+    _commit(source, "feature.py", "pass\n")
+    _git("checkout", "-q", "main", cwd=source)
+
+    mirror = RepoMirrorCache(str(tmp_path / "mirrors"))
+    bundle_path = asyncio.run(mirror.get_bundle("owner", "repo", str(source)))
+
+    checkout = tmp_path / "checkout"
+    _git("clone", "-q", bundle_path, str(checkout))
+
+    assert _git("rev-parse", "--abbrev-ref", "HEAD", cwd=checkout).strip() == "main"
+    assert _git("rev-parse", "HEAD", cwd=checkout) == _git("rev-parse", "main", cwd=source)
+    assert (checkout / "app.py").read_text() == "print('hi')\n"
+    assert not (checkout / "feature.py").exists()
+
+
+def test_forced_refresh_bundles_new_commits(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    _git("init", "-q", "-b", "main", str(source))
+    _commit(source, "README.md", "hello\n")
+
+    mirror = RepoMirrorCache(str(tmp_path / "mirrors"))
+    asyncio.run(mirror.get_bundle("owner", "repo", str(source)))
+    _commit(source, "CHANGELOG.md", "v2\n")
+    bundle_path = asyncio.run(mirror.get_bundle("owner", "repo", str(source), force=True))
+
+    checkout = tmp_path / "checkout"
+    _git("clone", "-q", bundle_path, str(checkout))
+
+    assert (checkout / "CHANGELOG.md").read_text() == "v2\n"
+
+
+def test_oversized_bundle_is_not_used(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    _git("init", "-q", "-b", "main", str(source))
+    _commit(source, "README.md", "hello\n")
+
+    mirror = RepoMirrorCache(str(tmp_path / "mirrors"), max_bundle_bytes=16)
+
+    assert asyncio.run(mirror.get_bundle("owner", "repo", str(source))) is None
+
+
+def test_auth_header_stays_off_the_command_line(tmp_path, monkeypatch):
+    calls = []
+
+    class FinishedProcess:
+        returncode = 0
+
+        async def communicate(self):
+            return b"", b""
+
+    async def create_subprocess_exec(*args, **kwargs):
+        calls.append((args, kwargs["env"]))
+        return FinishedProcess()
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", create_subprocess_exec)
+    mirror = RepoMirrorCache(str(tmp_path / "mirrors"))
+    header = "Authorization: Basic dXNlcjpzZWNyZXQ="
+
+    asyncio.run(mirror._git("clone", "--bare", "https://github.com/owner/repo.git", "dest", auth_header=header))
+
+    args, env = calls[0]
+    assert header not in " ".join(args)
+    assert env["GIT_CONFIG_KEY_0"] == "http.https://github.com/.extraHeader"
+    assert env["GIT_CONFIG_VALUE_0"] == header
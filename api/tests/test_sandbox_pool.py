@@ -0,0 +1,113 @@
+"""
+Sandbox Pool Tests - Reuse, eviction, the active cap and prewarming
+"""
+
+import asyncio
+import itertools
+import types
+
+from sandbox_pool import SandboxPool
+
+
+class FakeManager:
+    """Creates numbered sandboxes and records which ones were deleted"""
+
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self._ids = itertools.count(1)
+
+    def create_sandbox(self, name, sandbox_type="claude", resources=None):
+        sandbox = types.SimpleNamespace(id=f"sbx-{next(self._ids)}", name=name)
+        self.created.append(sandbox.id)
+        return sandbox
+
+    def delete_sandbox(self, sandbox_id):
+        self.deleted.append(sandbox_id)
+        return True
+
+
+def test_released_sandbox_is_reused():
+    manager = FakeManager()
+
+    async def run():
+        pool = SandboxPool(manager, "claude", max_idle=2)
+        first = await pool.acquire("a")
+        pool.mark_provisioned(first)
+        await pool.release(first)
+        second = await pool.acquire("b")
+        return first, second, pool.is_provisioned(second)
+
+    first, second, provisioned = asyncio.run(run())
+
+    assert second is first
+    assert provisioned
+    assert manager.created == ["sbx-1"] and manager.deleted == []
+
+
+def test_unreusable_sandbox_is_deleted():
+    manager = FakeManager()
+
+    async def run():
+        pool = SandboxPool(manager, "claude", max_idle=2)
+        sandbox = await pool.acquire("a")
+        pool.mark_provisioned(sandbox)
+        await pool.release(sandbox, reusable=False)
+        return await pool.acquire("b")
+
+    sandbox = asyncio.run(run())
+
+    assert manager.deleted == ["sbx-1"]
+    assert sandbox.id == "sbx-2"
+
+
+def test_expired_sandbox_is_replaced(monkeypatch):
+    manager = FakeManager()
+    clock = [1000.0]
+    monkeypatch.setattr("sandbox_pool.time.monotonic", lambda: clock[0])
+
+    async def run():
+        pool = SandboxPool(manager, "claude", max_idle=2, max_age=60)
+        sandbox = await pool.acquire("a")
+        await pool.release(sandbox)
+        clock[0] += 61
+        return await pool.acquire("b")
+
+    sandbox = asyncio.run(run())
+
+    assert manager.deleted == ["sbx-1"]
+    assert sandbox.id == "sbx-2"
+
+
+def test_acquire_waits_for_a_free_slot():
+    manager = FakeManager()
+
+    async def run():
+        pool = SandboxPool(manager, "claude", max_idle=1, max_active=1)
+        first = await pool.acquire("a")
+        waiting = asyncio.create_task(pool.acquire("b"))
+        await asyncio.sleep(0.05)
+        blocked = not waiting.done()
+        await pool.release(first)
+        return first, blocked, await asyncio.wait_for(waiting, 1)
+
+    first, blocked, second = asyncio.run(run())
+
+    assert blocked
+    assert second is first
+
+
+def test_prewarm_fills_to_min_idle():
+    manager = FakeManager()
+
+    async def run():
+        pool = SandboxPool(manager, "claude", max_idle=3, min_idle=2)
+        pool.prewarm()
+        await pool._fill_task
+        idle = pool._idle.qsize()
+        await pool.close()
+        return idle
+
+    assert asyncio.run(run()) == 2
+    assert len(manager.created) == 2
+    assert sorted(manager.deleted) == sorted(manager.created)
@@ -0,0 +1,48 @@
+"""
+SSE Adapter Tests - Frame formatting and coalescing
+"""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from sse_adapter import SSEAdapter, coalesce_frames
+
+
+def test_tool_message_frame_is_valid_json():
+    frame = SSEAdapter().format_tool_message("Bash", 'echo "done"\n')
+    
+    assert frame.startswith("data: ") and frame.endswith("\n\n")
+    payload = json.loads(frame[len("data: "):])
+    assert payload["type"] == "Tool: Bash"
+    assert payload["message"] == 'echo "done"\n'
+    assert list(payload) == ["type", "message", "timestamp"]
+
+
+def test_coalesce_joins_a_burst_of_frames():
+    async def source():
+        for frame in ("a", "b", "c"):
+            yield frame
+    
+    async def collect():
+        return [chunk async for chunk in coalesce_frames(source(), max_delay=1.0)]
+    
+    assert asyncio.run(collect()) == ["abc"]
+
+
+def test_coalesce_delivers_batch_before_source_error():
+    async def source():
+        yield "a"
+        raise RuntimeError("source failed")
+    
+    async def collect():
+        chunks = []
+        with pytest.raises(RuntimeError, match="source failed"):
+            async for chunk in coalesce_frames(source(), max_delay=1.0):
+                chunks.append(chunk)
+        return chunks
+    
+    assert asyncio.run(collect()) == ["a"]
@@ -8,8 +8,12 @@ import os
 import sys
 import json
 import asyncio
+import inspect
+import uuid
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from functools import partial
+from typing import Optional, Dict, Any, List, AsyncIterator, Union
 from pathlib import Path
 
 from daytona import Daytona, DaytonaConfig, SandboxState
@@ -17,6 +21,35 @@ from daytona import CreateSandboxFromImageParams, Resources
 from rich.console import Console
 from dotenv import load_dotenv
 
+# Declarative image builds are only available in newer SDK releases
+try:
+    from daytona import Image
+except ImportError:
+    Image = None
+
+# Process sessions (needed for streaming output) are only available in newer SDK releases
+try:
+    from daytona import SessionExecuteRequest
+except ImportError:
+    SessionExecuteRequest = None
+
+
+# Session log polling interval: reset while output arrives, backed off up to the max while idle
+_POLL_MIN_DELAY = 0.01
+_POLL_MAX_DELAY = 0.5
+
+# Tooling baked into the prebuilt agent image (mirrors the orchestrator's per-sandbox install)
+BASE_IMAGE_COMMANDS = [
+    "apt-get update -qq && apt-get install -y curl ca-certificates gnupg git python3 python3-pip",
+    "mkdir -p /etc/apt/keyrings",
+    "curl -fsSL https://deb.nodesource.com/gpgkey/nodesource-repo.gpg.key | gpg --dearmor -o /etc/apt/keyrings/nodesource.gpg",
+    "echo 'deb [signed-by=/etc/apt/keyrings/nodesource.gpg] https://deb.nodesource.com/node_18.x nodistro main' > /etc/apt/sources.list.d/nodesource.list",
+    "curl -fsSL https://cli.github.com/packages/githubcli-archive-keyring.gpg | dd of=/usr/share/keyrings/githubcli-archive-keyring.gpg",
+    'echo "deb [arch=$(dpkg --print-architecture) signed-by=/usr/share/keyrings/githubcli-archive-keyring.gpg] https://cli.github.com/packages stable main" > /etc/apt/sources.list.d/github-cli.list',
+    "apt-get update -qq && apt-get install -y nodejs gh",
+    "npm install -g @google/gemini-cli",
+]
+
 
 class PermissionManager:
     """Simple permission manager for automated operations"""
@@ -43,6 +76,11 @@ class DaytonaManagerRefactored:
         # Initialize permission manager
         self.permission_manager = PermissionManager()
         
+        # Prebuilt agent images (set DAYTONA_PREBUILT_IMAGES=false to install per sandbox)
+        self.prebuilt_images = os.getenv('DAYTONA_PREBUILT_IMAGES', 'true').lower() != 'false'
+        self._base_images: Dict[str, Any] = {}
+        self._base_image_failed: set = set()
+        
         if not self.api_key:
             self.console.print("[red]❌ DAYTONA_API_KEY not found in environment variables[/red]")
             sys.exit(1)
@@ -59,6 +97,28 @@ class DaytonaManagerRefactored:
             self.console.print(f"[red]❌ Failed to connect to Daytona: {e}[/red]")
             sys.exit(1)
     
+    def uses_base_image(self, sandbox_type: str) -> bool:
+        """Check whether sandboxes of this type are created from the prebuilt image"""
+        return (
+            self.prebuilt_images
+            and Image is not None
+            and sandbox_type in ("claude", "gemini")
+            and sandbox_type not in self._base_image_failed
+        )
+    
+    def build_base_image(self, sandbox_type: str) -> Optional[Any]:
+        """Build the image with git, gh, Node.js and the Gemini CLI preinstalled
+        
+        The image definition is built once per sandbox type and cached; Daytona
+        caches the resulting image, so only the first sandbox pays the build.
+        """
+        if not self.uses_base_image(sandbox_type):
+            return None
+        
+        if sandbox_type not in self._base_images:
+            self._base_images[sandbox_type] = Image.base("ubuntu:22.04").run_commands(*BASE_IMAGE_COMMANDS)
+        return self._base_images[sandbox_type]
+    
     def create_sandbox(
         self,
         name: str,
@@ -80,16 +140,17 @@ class DaytonaManagerRefactored:
         }
         
         image = image_map.get(sandbox_type, image_map["basic"])
+        base_image = self.build_base_image(sandbox_type)
         
         try:
             self.console.print(f"\n[cyan]Creating sandbox '{name}' with {sandbox_type} image...[/cyan]")
-            self.console.print(f"[dim]Image: {image}[/dim]")
+            self.console.print(f"[dim]Image: {image}{' (prebuilt agent tooling)' if base_image else ''}[/dim]")
             self.console.print(f"[dim]Resources: CPU={resources.get('cpu', 2)}, Memory={resources.get('memory', 4)}GB[/dim]")
             
             # Create sandbox parameters
             params = CreateSandboxFromImageParams(
                 name=name,
-                image=image,
+                image=base_image or image,
                 resources=Resources(
                     cpu=resources.get("cpu", 2),
                     memory=resources.get("memory", 4)
@@ -111,6 +172,12 @@ class DaytonaManagerRefactored:
             return sandbox
             
         except Exception as e:
+            if base_image:
+                # Fall back to the plain image and per-sandbox installs from now on
+                self.console.print(f"[yellow]⚠️  Prebuilt image failed, using {image}: {e}[/yellow]")
+                self._base_image_failed.add(sandbox_type)
+                return self.create_sandbox(name, sandbox_type, resources)
+            
             self.console.print(f"[red]❌ Failed to create sandbox: {e}[/red]")
             print(f"ERROR in create_sandbox: {e}", flush=True)
             import traceback
@@ -159,12 +226,16 @@ class DaytonaManagerRefactored:
         self,
         sandbox: Any,
         command: str,
-        show_output: bool = True
+        show_output: bool = True,
+        env: Optional[Dict[str, str]] = None
     ) -> Optional[str]:
-        """Execute a command in the sandbox"""
+        """Execute a command in the sandbox
+        
+        env is passed to the process environment, keeping secrets off the command line.
+        """
         try:
             # Execute command in sandbox using the process interface
-            exec_result = sandbox.process.exec(command)
+            exec_result = sandbox.process.exec(command, env=env) if env else sandbox.process.exec(command)
             
             # Extract the actual output from the ExecuteResponse object
             # The ExecuteResponse has a 'result' attribute containing the command output
@@ -181,6 +252,148 @@ class DaytonaManagerRefactored:
             # Return empty string instead of None to avoid TypeError
             return ""
     
+    @staticmethod
+    def script_command(script: str) -> str:
+        """Wrap a multi-line script so it runs as one bash invocation
+        
+        The script is passed through a quoted here-doc as the -c argument rather
+        than on stdin, so commands inside it that read stdin can't swallow the
+        rest of the script.
+        """
+        return f"bash -c \"$(cat <<'__TB_BATCH__'\n{script}\n__TB_BATCH__\n)\""
+    
+    def execute_batch(
+        self,
+        sandbox: Any,
+        script: str,
+        show_output: bool = True,
+        env: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """Execute a multi-line script in the sandbox in a single round-trip"""
+        return self.execute_command(sandbox, self.script_command(script), show_output, env)
+    
+    def supports_streaming(self, sandbox: Any) -> bool:
+        """Check whether command output can be streamed from this sandbox"""
+        return SessionExecuteRequest is not None and hasattr(sandbox.process, "create_session")
+    
+    async def stream_command(
+        self,
+        sandbox: Any,
+        command: str,
+        executor: Optional[Executor] = None
+    ) -> AsyncIterator[str]:
+        """Run a command in its own session and yield its output line by line
+        
+        Output is pushed from the sandbox when the SDK supports log streaming
+        and polled otherwise. Closing the iterator deletes the session, which
+        stops the command. Raises RuntimeError when the command exits non-zero.
+        SDK calls run on executor (the loop's default executor if None).
+        """
+        session_id = f"stream-{uuid.uuid4().hex[:8]}"
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        
+        def call(func, *args):
+            return loop.run_in_executor(executor, partial(func, *args))
+        
+        def on_chunk(chunk: str) -> None:
+            # The SDK may call back from another thread
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        
+        await call(sandbox.process.create_session, session_id)
+        try:
+            response = await call(
+                sandbox.process.execute_session_command,
+                session_id,
+                SessionExecuteRequest(command=command, run_async=True)
+            )
+            
+            async def pump() -> None:
+                try:
+                    stream_logs = getattr(sandbox.process, "get_session_command_logs_async", None)
+                    if stream_logs is None:
+                        await self._poll_session_logs(sandbox, session_id, response.cmd_id, on_chunk, call)
+                    elif len(inspect.signature(stream_logs).parameters) >= 4:
+                        # Newer SDKs take separate stdout and stderr callbacks
+                        await stream_logs(session_id, response.cmd_id, on_chunk, on_chunk)
+                    else:
+                        await stream_logs(session_id, response.cmd_id, on_chunk)
+                finally:
+                    loop.call_soon_threadsafe(chunks.put_nowait, None)
+            
+            pump_task = asyncio.create_task(pump())
+            try:
+                pending = ""
+                while (chunk := await chunks.get()) is not None:
+                    # Only the new chunk is scanned; a partial line just grows until its newline arrives
+                    data = pending + chunk
+                    start, end = 0, data.find("\n", len(pending))
+                    while end != -1:
+                        yield data[start:end]
+                        start = end + 1
+                        end = data.find("\n", start)
+                    pending = data[start:]
+                if pending:
+                    yield pending
+                # A failed log stream also ends the queue; re-raise it rather than finish quietly
+                await pump_task
+            finally:
+                pump_task.cancel()
+                await asyncio.gather(pump_task, return_exceptions=True)
+            
+            cmd_info = await call(sandbox.process.get_session_command, session_id, response.cmd_id)
+            if cmd_info.exit_code:
+                raise RuntimeError(f"Command exited with code {cmd_info.exit_code}")
+        finally:
+            try:
+                await call(sandbox.process.delete_session, session_id)
+            except Exception:
+                pass
+    
+    async def _poll_session_logs(self, sandbox: Any, session_id: str, cmd_id: str, on_chunk, call) -> None:
+        """Fallback for SDKs without log streaming: poll the command logs
+        
+        Polls quickly while output is arriving and backs off while the command
+        is quiet. Status is only checked when no new output came in.
+        """
+        last_position = 0
+        delay = _POLL_MIN_DELAY
+        finished = False
+        while True:
+            # The SDK returns the full log, there is no offset
+            logs = await call(sandbox.process.get_session_command_logs, session_id, cmd_id)
+            
+            if logs and len(logs) > last_position:
+                on_chunk(logs[last_position:])
+                last_position = len(logs)
+                delay = _POLL_MIN_DELAY
+            elif finished:
+                break
+            else:
+                # Read the logs once more after the command exits for its last output
+                cmd_info = await call(sandbox.process.get_session_command, session_id, cmd_id)
+                if cmd_info.exit_code is not None:
+                    finished = True
+                    continue
+                delay = min(delay * 1.5, _POLL_MAX_DELAY)
+            
+            await asyncio.sleep(delay)
+    
+    def upload_file(self, sandbox: Any, content: Union[bytes, str], remote_path: str) -> bool:
+        """Upload file content to a path inside the sandbox
+        
+        content is either the raw bytes or a local file path, which the SDK
+        streams from disk.
+        """
+        try:
+            sandbox.fs.upload_file(content, remote_path)
+            return True
+            
+        except Exception as e:
+            self.console.print(f"[red]❌ File upload failed: {e}[/red]")
+            print(f"ERROR in upload_file: {remote_path} - {e}", flush=True)
+            return False
+    
     def list_sandboxes(self) -> Optional[List[Any]]:
         """List all sandboxes"""
         try:
@@ -7,9 +7,13 @@ Creates and manages Gemini CLI environments using Daytona SDK
 import os
 import sys
 import json
+import shlex
 import asyncio
+import uuid
+from concurrent.futures import Executor
+from functools import partial
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator
 from pathlib import Path
 
 from daytona import Daytona, DaytonaConfig
@@ -17,6 +21,12 @@ from daytona import CreateSandboxFromImageParams, Resources
 from rich.console import Console
 from dotenv import load_dotenv
 
+# Process sessions (needed for streaming output) are only available in newer SDK releases
+try:
+    from daytona import SessionExecuteRequest
+except ImportError:
+    SessionExecuteRequest = None
+
 
 class GeminiDaytonaManager:
     """Manages Daytona sandboxes with Gemini CLI integration"""
@@ -87,6 +97,24 @@ class GeminiDaytonaManager:
             self.console.print(f"[red]❌ Failed to create sandbox: {e}[/red]")
             return None
     
+    def create_sandbox(self,
+                       name: Optional[str] = None,
+                       sandbox_type: str = "gemini",
+                       resources: Optional[Dict[str, int]] = None) -> Any:
+        """Create a Gemini sandbox (the signature SandboxPool expects)"""
+        return self.create_gemini_sandbox(name, resources)
+    
+    def reset_sandbox(self, sandbox: Any) -> bool:
+        """Remove per-request state so the sandbox can serve another request"""
+        # Checkouts, git identity and the gh login of the last request; tools stay installed
+        result = self.execute_command(sandbox, (
+            "rm -rf /workspace/* /workspace/.[!.]* 2>/dev/null; "
+            "git config --global --unset-all user.name; "
+            "git config --global --unset-all user.email; "
+            "rm -f ~/.config/gh/hosts.yml; echo RESET_OK"
+        ), show_output=False)
+        return "RESET_OK" in str(result)
+    
     def setup_gemini_cli(self, sandbox: Any) -> bool:
         """Install and configure Gemini CLI in the sandbox"""
         self.console.print("[blue]🔧 Setting up Gemini CLI...[/blue]")
@@ -127,10 +155,19 @@ class GeminiDaytonaManager:
         self.console.print("[green]✅ Gemini CLI setup complete[/green]")
         return True
     
-    def execute_command(self, sandbox: Any, command: str, show_output: bool = True) -> str:
-        """Execute a command in the sandbox"""
+    def execute_command(
+        self,
+        sandbox: Any,
+        command: str,
+        show_output: bool = True,
+        env: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Execute a command in the sandbox
+        
+        env is passed to the process environment, keeping secrets off the command line.
+        """
         try:
-            result = sandbox.process.exec(command)
+            result = sandbox.process.exec(command, env=env) if env else sandbox.process.exec(command)
             
             if hasattr(result, 'stdout'):
                 output = result.stdout
@@ -157,10 +194,13 @@ class GeminiDaytonaManager:
         # Extract repo name from URL
         repo_name = repo_url.rstrip('/').split('/')[-1].replace('.git', '')
         
+        # git -C sets the working directory without a shell `cd`. Only HEAD is needed and
+        # the image's git supports partial clone, so blobs are fetched as Gemini reads files
+        clone_flags = ["--depth=1", "--filter=blob:none", "--single-branch", "--no-tags"]
         commands = [
             "mkdir -p /workspace",
-            f"cd /workspace && git clone {repo_url}",
-            f"cd /workspace/{repo_name} && pwd"
+            shlex.join(["git", "-C", "/workspace", "clone", *clone_flags, repo_url]),
+            shlex.join(["git", "-C", f"/workspace/{repo_name}", "rev-parse", "--show-toplevel"])
         ]
         
         for cmd in commands:
@@ -174,10 +214,8 @@ class GeminiDaytonaManager:
         self.console.print(f"[green]✅ Repository cloned successfully[/green]")
         return True
     
-    def execute_gemini_prompt(self, sandbox: Any, prompt: str, repo_name: str) -> Dict[str, Any]:
-        """Execute a Gemini prompt in the sandbox context"""
-        self.console.print(f"[blue]🤖 Executing Gemini prompt...[/blue]")
-        
+    def _gemini_command(self, prompt: str, repo_name: str) -> str:
+        """Build the Gemini CLI command for a prompt in the cloned repository"""
         # Create a context-aware prompt
         gemini_prompt = f"""
 You are working in a Git repository located at /workspace/{repo_name}.
@@ -188,9 +226,14 @@ After making changes, create a feature branch and prepare for a pull request.
 """
         
         # Execute Gemini CLI with the prompt
-        gemini_command = f'cd /workspace/{repo_name} && gemini "{gemini_prompt}"'
+        # The prompt holds user text, so it is quoted as a single argument
+        return f"cd {shlex.quote(f'/workspace/{repo_name}')} && " + shlex.join(["gemini", gemini_prompt])
+    
+    def execute_gemini_prompt(self, sandbox: Any, prompt: str, repo_name: str) -> Dict[str, Any]:
+        """Execute a Gemini prompt in the sandbox context"""
+        self.console.print(f"[blue]🤖 Executing Gemini prompt...[/blue]")
         
-        result = self.execute_command(sandbox, gemini_command)
+        result = self.execute_command(sandbox, self._gemini_command(prompt, repo_name))
         
         return {
             "success": "error" not in str(result).lower(),
@@ -198,6 +241,68 @@ After making changes, create a feature branch and prepare for a pull request.
             "repo_path": f"/workspace/{repo_name}"
         }
     
+    def supports_streaming(self, sandbox: Any) -> bool:
+        """Check whether command output can be streamed from this sandbox"""
+        return SessionExecuteRequest is not None and hasattr(sandbox.process, "create_session")
+    
+    async def stream_gemini_prompt(
+        self,
+        sandbox: Any,
+        prompt: str,
+        repo_name: str,
+        executor: Optional[Executor] = None
+    ) -> AsyncIterator[str]:
+        """Execute a Gemini prompt in its own session and yield its output line by line
+        
+        New output is polled from the session while the CLI runs. Closing the
+        iterator deletes the session, which stops the command. SDK calls run
+        on executor (the loop's default executor if None).
+        """
+        self.console.print(f"[blue]🤖 Executing Gemini prompt (streaming)...[/blue]")
+        
+        loop = asyncio.get_running_loop()
+        
+        def call(func, *args):
+            return loop.run_in_executor(executor, partial(func, *args))
+        
+        session_id = f"gemini-{uuid.uuid4().hex[:8]}"
+        await call(sandbox.process.create_session, session_id)
+        try:
+            response = await call(
+                sandbox.process.execute_session_command,
+                session_id,
+                SessionExecuteRequest(command=f"{self._gemini_command(prompt, repo_name)} 2>&1", run_async=True)
+            )
+            
+            received = 0
+            pending = ""
+            while True:
+                cmd_info = await call(sandbox.process.get_session_command, session_id, response.cmd_id)
+                logs = await call(sandbox.process.get_session_command_logs, session_id, response.cmd_id)
+                
+                # Only the new tail of the log is scanned; a partial last line waits for the next poll
+                if logs and len(logs) > received:
+                    data = pending + logs[received:]
+                    received = len(logs)
+                    start, end = 0, data.find("\n", len(pending))
+                    while end != -1:
+                        yield data[start:end]
+                        start = end + 1
+                        end = data.find("\n", start)
+                    pending = data[start:]
+                
+                if cmd_info.exit_code is not None:
+                    break
+                await asyncio.sleep(0.5)
+            
+            if pending:
+                yield pending
+        finally:
+            try:
+                await call(sandbox.process.delete_session, session_id)
+            except Exception:
+                pass
+    
     def create_pull_request(self, sandbox: Any, repo_name: str, branch_name: str, pr_title: str, pr_body: str) -> Optional[str]:
         """Create a pull request using GitHub CLI"""
         self.console.print("[blue]🔀 Creating pull request...[/blue]")
@@ -207,21 +312,28 @@ After making changes, create a feature branch and prepare for a pull request.
             self.console.print("[red]❌ GITHUB_TOKEN not found in environment[/red]")
             return None
         
+        # Each command is a separate exec, so the repository is passed to every git
+        # call with -C (a standalone `cd` would not carry over to the next command)
+        repo_dir = f"/workspace/{repo_name}"
+        git = ["git", "-C", repo_dir]
+        # The token reaches gh on stdin from an env var, so it never appears in a command
+        auth_login = 'printf "%s" "$TB_GH_TOKEN" | gh auth login --with-token'
         commands = [
-            f"cd /workspace/{repo_name}",
-            f"git config --global user.email '{os.getenv('GITHUB_EMAIL', 'bot@example.com')}'",
-            f"git config --global user.name '{os.getenv('GITHUB_USERNAME', 'Gemini Bot')}'",
-            f"git checkout -b {branch_name}",
-            "git add -A",
-            f'git commit -m "{pr_title}"',
-            f"GH_TOKEN={github_token} gh auth login --with-token",
-            f"git push origin {branch_name}",
-            f'gh pr create --title "{pr_title}" --body "{pr_body}"'
+            shlex.join(["git", "config", "--global", "user.email", os.getenv('GITHUB_EMAIL', 'bot@example.com')]),
+            shlex.join(["git", "config", "--global", "user.name", os.getenv('GITHUB_USERNAME', 'Gemini Bot')]),
+            shlex.join([*git, "checkout", "-b", branch_name]),
+            shlex.join([*git, "add", "-A"]),
+            shlex.join([*git, "commit", "-m", pr_title]),
+            auth_login,
+            shlex.join([*git, "push", "origin", branch_name]),
+            # gh has no -C option, so it runs from the repository directory
+            f"cd {shlex.quote(repo_dir)} && " + shlex.join(["gh", "pr", "create", "--title", pr_title, "--body", pr_body])
         ]
         
         pr_url = None
         for cmd in commands:
-            result = self.execute_command(sandbox, cmd)
+            env = {"TB_GH_TOKEN": github_token} if cmd is auth_login else None
+            result = self.execute_command(sandbox, cmd, env=env)
             if "github.com" in str(result) and "/pull/" in str(result):
                 pr_url = result.strip()
         
@@ -7,17 +7,33 @@ Handles real-time streaming of Gemini CLI output with SSE support
 import re
 import json
 import asyncio
+from concurrent.futures import Executor
+from contextlib import aclosing
+from functools import partial
 from typing import AsyncGenerator, Dict, Any, Optional, Callable
 from datetime import datetime
 from rich.console import Console
 
+# orjson encodes SSE payloads several times faster; fall back to json if not installed
+try:
+    import orjson
+    
+    def _dumps(data: Any) -> str:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _dumps = json.dumps
+
 
 class GeminiStreamingHandler:
     """Handles streaming responses from Gemini CLI"""
     
-    def __init__(self, console: Optional[Console] = None):
-        """Initialize the streaming handler"""
+    def __init__(self, console: Optional[Console] = None, executor: Optional[Executor] = None):
+        """Initialize the streaming handler
+        
+        Blocking sandbox operations run on executor (the loop's default executor if None).
+        """
         self.console = console or Console()
+        self.executor = executor
         self.tool_patterns = {
             'read': re.compile(r'Reading file:\s*(.+)'),
             'write': re.compile(r'Writing to file:\s*(.+)'),
@@ -96,9 +112,13 @@ class GeminiStreamingHandler:
                 "timestamp": datetime.now().isoformat()
             })
     
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        """Run a blocking sandbox operation on the handler's executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args))
+    
     def _format_sse(self, data: Dict[str, Any]) -> str:
         """Format data as Server-Sent Event"""
-        return f"data: {json.dumps(data)}\n\n"
+        return f"data: {_dumps(data)}\n\n"
     
     async def stream_coding_process(self,
                                   sandbox_operations: Dict[str, Callable],
@@ -114,7 +134,7 @@ class GeminiStreamingHandler:
             "timestamp": datetime.now().isoformat()
         })
         
-        clone_result = await asyncio.to_thread(sandbox_operations['clone'], repo_url)
+        clone_result = await self._run(sandbox_operations['clone'], repo_url)
         
         if not clone_result:
             yield self._format_sse({
@@ -139,11 +159,22 @@ class GeminiStreamingHandler:
         })
         
         repo_name = repo_url.rstrip('/').split('/')[-1].replace('.git', '')
-        gemini_result = await asyncio.to_thread(
-            sandbox_operations['execute_gemini'], 
-            prompt, 
-            repo_name
-        )
+        if 'stream_gemini' in sandbox_operations:
+            # Forward each line as the CLI prints it instead of waiting for the whole run
+            gemini_result = {"success": True}
+            async with aclosing(sandbox_operations['stream_gemini'](prompt, repo_name)) as lines:
+                async for line in lines:
+                    if 'error' in line.lower():
+                        gemini_result["success"] = False
+                    event = self.parse_gemini_output(line)
+                    if event:
+                        yield self._format_sse(event)
+        else:
+            gemini_result = await self._run(
+                sandbox_operations['execute_gemini'], 
+                prompt, 
+                repo_name
+            )
         
         # Stream Gemini output
         if gemini_result.get('output'):
@@ -167,7 +198,7 @@ class GeminiStreamingHandler:
             pr_title = f"Implement: {prompt[:50]}..."
             pr_body = f"This PR implements the following request:\n\n{prompt}\n\n---\n*Generated by Gemini CLI*"
             
-            pr_url = await asyncio.to_thread(
+            pr_url = await self._run(
                 sandbox_operations['create_pr'],
                 repo_name,
                 branch_name,